@@ -1,24 +1,70 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-import json
+import atexit
+import hashlib
 import logging
+import logging.handlers
 import os
-from json_generator import generate_workflow, save_workflow, suggest_pieces_for_prompt, PIECE_INDEX, print_pieces_summary
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import orjson
+from json_generator import generate_workflow, save_workflow, workflow_filename, suggest_pieces_for_prompt, PIECE_INDEX, print_pieces_summary
 
 # Configure logging
+# Request threads only enqueue records; a listener thread applies the final
+# formatting and does the stderr writes
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# QueueHandler.prepare() bakes its own formatter's output into the record, so
+# it must only merge the message args or the listener would format it twice
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    handlers=[_queue_handler]
 )
 logger = logging.getLogger(__name__)
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that parses requests and serializes responses with orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # orjson emits bytes directly, so skip the str round-trip used by dumps()
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype=self.mimetype)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for all routes
 
+# Shared pool for independent, I/O-bound OpenAI calls
+_EXECUTOR = ThreadPoolExecutor(max_workers=16)
+
+def _static_json_response(body, etag):
+    """Return a pre-serialized JSON body, answering 304 when the ETag matches"""
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+_HEALTH_BYTES = orjson.dumps({"status": "healthy"})
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy"}), 200
+    return Response(_HEALTH_BYTES, mimetype='application/json')
 
 @app.route('/generate', methods=['POST'])
 def generate_workflow_endpoint():
@@ -58,26 +104,23 @@ def generate_workflow_endpoint():
             }), 400
         
         # Log the received prompt
-        logger.info(f"Received prompt: {prompt}")
+        logger.info("Received prompt: %s", prompt)
         
         # Get piece suggestions based on prompt
         suggestions = suggest_pieces_for_prompt(prompt)
-        logger.info(f"Suggested pieces: {suggestions}")
+        logger.info("Suggested pieces: %s", suggestions)
         
         # Generate workflow
         logger.info("Generating workflow...")
         workflow = generate_workflow(prompt)
         
-        # Save workflow to file
-        filename = save_workflow(workflow)
-        logger.info(f"Workflow saved to: {filename}")
+        # Save workflow to file in the background; the filename is known up front
+        filename = workflow_filename(workflow)
+        _EXECUTOR.submit(save_workflow, workflow).add_done_callback(_log_save_result)
         
-        # Display the generated JSON in terminal (formatted)
-        print("\n" + "="*50)
-        print("GENERATED WORKFLOW JSON:")
-        print("="*50)
-        print(json.dumps(workflow, indent=2))
-        print("="*50 + "\n")
+        # Dump the generated workflow only when debug logging is enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Generated workflow: %s", workflow)
         
         # Return success response with suggestions
         return jsonify({
@@ -90,7 +133,7 @@ def generate_workflow_endpoint():
         
     except Exception as e:
         # Log error
-        logger.error(f"Error generating workflow: {str(e)}")
+        logger.error("Error generating workflow: %s", e)
         
         # Return error response
         return jsonify({
@@ -98,6 +141,37 @@ def generate_workflow_endpoint():
             "error": str(e)
         }), 500
 
+def _log_save_result(future):
+    """Log the outcome of a background save_workflow() call"""
+    try:
+        logger.info("Workflow saved to: %s", future.result())
+    except Exception as e:
+        logger.error("Error saving workflow: %s", e)
+
+def _process_one(i, total, prompt):
+    """Generate and save the workflow for a single batch prompt"""
+    try:
+        logger.info("Processing prompt %d/%d: %s", i + 1, total, prompt)
+        workflow = generate_workflow(prompt)
+        filename = save_workflow(workflow)
+        
+        return {
+            "success": True,
+            "index": i,
+            "prompt": prompt,
+            "workflow": workflow,
+            "filename": filename
+        }
+        
+    except Exception as e:
+        logger.error("Error with prompt %d: %s", i + 1, e)
+        return {
+            "success": False,
+            "index": i,
+            "prompt": prompt,
+            "error": str(e)
+        }
+
 @app.route('/generate-batch', methods=['POST'])
 def generate_batch_workflows():
     """
@@ -107,6 +181,9 @@ def generate_batch_workflows():
     {
         "prompts": ["prompt1", "prompt2", ...]
     }
+    
+    Results are streamed in completion order; each carries the "index"
+    of its prompt in the request.
     """
     try:
         data = request.get_json()
@@ -118,67 +195,72 @@ def generate_batch_workflows():
             }), 400
         
         prompts = data.get('prompts', [])
-        results = []
+        futures = [
+            _EXECUTOR.submit(_process_one, i, len(prompts), prompt)
+            for i, prompt in enumerate(prompts)
+        ]
         
-        for i, prompt in enumerate(prompts):
-            try:
-                logger.info(f"Processing prompt {i+1}/{len(prompts)}: {prompt}")
-                workflow = generate_workflow(prompt)
-                filename = save_workflow(workflow)
-                
-                results.append({
-                    "success": True,
-                    "prompt": prompt,
-                    "workflow": workflow,
-                    "filename": filename
-                })
-                
-            except Exception as e:
-                logger.error(f"Error with prompt {i+1}: {str(e)}")
-                results.append({
-                    "success": False,
-                    "prompt": prompt,
-                    "error": str(e)
-                })
+        def stream_results():
+            yield b'{"success":true,"results":['
+            for n, future in enumerate(as_completed(futures)):
+                if n:
+                    yield b','
+                yield orjson.dumps(future.result())
+            yield b']}'
         
-        return jsonify({
-            "success": True,
-            "results": results
-        }), 200
+        return Response(stream_with_context(stream_results()), mimetype='application/json')
         
     except Exception as e:
-        logger.error(f"Batch processing error: {str(e)}")
+        logger.error("Batch processing error: %s", e)
         return jsonify({
             "success": False,
             "error": str(e)
         }), 500
 
+# The frontend is a single static file, so it is read into memory once
+try:
+    with open(os.path.join(os.path.dirname(__file__), 'index.html'), 'rb') as f:
+        _INDEX_HTML = f.read()
+    _INDEX_ETAG = hashlib.md5(_INDEX_HTML).hexdigest()
+except FileNotFoundError:
+    _INDEX_HTML = None
+
 @app.route('/', methods=['GET'])
 def index():
     """Serve the HTML frontend"""
-    html_path = os.path.join(os.path.dirname(__file__), 'index.html')
-    if os.path.exists(html_path):
-        return send_file(html_path)
-    else:
+    if _INDEX_HTML is None:
         return jsonify({"error": "Frontend not found"}), 404
+    
+    response = Response(_INDEX_HTML, mimetype='text/html')
+    response.set_etag(_INDEX_ETAG)
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
+
+# PIECE_INDEX never changes at runtime, so /pieces is serialized once at startup
+_TOTAL_ACTIONS = sum(len(p.get("actions", [])) for p in PIECE_INDEX.values())
+_TOTAL_TRIGGERS = sum(len(p.get("triggers", [])) for p in PIECE_INDEX.values())
+
+_PIECES_SUMMARY = {
+    "total_pieces": len(PIECE_INDEX),
+    "total_actions": _TOTAL_ACTIONS,
+    "total_triggers": _TOTAL_TRIGGERS,
+    "categories": {
+        "communication": ["@activepieces/piece-gmail", "@activepieces/piece-slack", "@activepieces/piece-discord"],
+        "ai_ml": ["@activepieces/piece-openai", "@activepieces/piece-claude", "@activepieces/piece-google-gemini"],
+        "storage": ["@activepieces/piece-google-drive", "@activepieces/piece-dropbox", "@activepieces/piece-amazon-s3"],
+        "databases": ["@activepieces/piece-postgres", "@activepieces/piece-mysql", "@activepieces/piece-mongodb"],
+        "automation": ["@activepieces/piece-schedule", "@activepieces/piece-webhook", "@activepieces/piece-delay"]
+    },
+    "pieces": PIECE_INDEX
+}
+_PIECES_SUMMARY_BYTES = orjson.dumps(_PIECES_SUMMARY)
+_PIECES_SUMMARY_ETAG = hashlib.md5(_PIECES_SUMMARY_BYTES).hexdigest()
 
 @app.route('/pieces', methods=['GET'])
 def list_pieces():
     """List all available pieces with their actions and triggers"""
-    pieces_summary = {
-        "total_pieces": len(PIECE_INDEX),
-        "total_actions": sum(len(p.get("actions", [])) for p in PIECE_INDEX.values()),
-        "total_triggers": sum(len(p.get("triggers", [])) for p in PIECE_INDEX.values()),
-        "categories": {
-            "communication": ["@activepieces/piece-gmail", "@activepieces/piece-slack", "@activepieces/piece-discord"],
-            "ai_ml": ["@activepieces/piece-openai", "@activepieces/piece-claude", "@activepieces/piece-google-gemini"],
-            "storage": ["@activepieces/piece-google-drive", "@activepieces/piece-dropbox", "@activepieces/piece-amazon-s3"],
-            "databases": ["@activepieces/piece-postgres", "@activepieces/piece-mysql", "@activepieces/piece-mongodb"],
-            "automation": ["@activepieces/piece-schedule", "@activepieces/piece-webhook", "@activepieces/piece-delay"]
-        },
-        "pieces": PIECE_INDEX
-    }
-    return jsonify(pieces_summary), 200
+    return _static_json_response(_PIECES_SUMMARY_BYTES, _PIECES_SUMMARY_ETAG)
 
 @app.route('/pieces/<piece_name>', methods=['GET'])
 def get_piece_details(piece_name):
@@ -224,57 +306,61 @@ def suggest_pieces():
         "suggestions": detailed_suggestions
     }), 200
 
+_API_DOCS_BYTES = orjson.dumps({
+    "name": "Activepieces Workflow Generator API",
+    "version": "1.0.0",
+    "endpoints": {
+        "/": "Web interface",
+        "/api": "API documentation (this page)",
+        "/health": "Health check endpoint",
+        "/generate": {
+            "method": "POST",
+            "description": "Generate a single workflow from a prompt",
+            "body": {
+                "prompt": "string - Your workflow description"
+            }
+        },
+        "/generate-batch": {
+            "method": "POST",
+            "description": "Generate multiple workflows from multiple prompts",
+            "body": {
+                "prompts": ["array", "of", "prompts"]
+            }
+        },
+        "/pieces": {
+            "method": "GET",
+            "description": "List all available pieces with actions and triggers"
+        },
+        "/pieces/{piece_name}": {
+            "method": "GET",
+            "description": "Get details about a specific piece"
+        },
+        "/suggest": {
+            "method": "POST",
+            "description": "Get piece suggestions based on a prompt",
+            "body": {
+                "prompt": "string - Your workflow description"
+            }
+        }
+    }
+})
+_API_DOCS_ETAG = hashlib.md5(_API_DOCS_BYTES).hexdigest()
+
 @app.route('/api', methods=['GET'])
 def api_docs():
     """API documentation"""
-    return jsonify({
-        "name": "Activepieces Workflow Generator API",
-        "version": "1.0.0",
-        "endpoints": {
-            "/": "Web interface",
-            "/api": "API documentation (this page)",
-            "/health": "Health check endpoint",
-            "/generate": {
-                "method": "POST",
-                "description": "Generate a single workflow from a prompt",
-                "body": {
-                    "prompt": "string - Your workflow description"
-                }
-            },
-            "/generate-batch": {
-                "method": "POST",
-                "description": "Generate multiple workflows from multiple prompts",
-                "body": {
-                    "prompts": ["array", "of", "prompts"]
-                }
-            },
-            "/pieces": {
-                "method": "GET",
-                "description": "List all available pieces with actions and triggers"
-            },
-            "/pieces/{piece_name}": {
-                "method": "GET",
-                "description": "Get details about a specific piece"
-            },
-            "/suggest": {
-                "method": "POST",
-                "description": "Get piece suggestions based on a prompt",
-                "body": {
-                    "prompt": "string - Your workflow description"
-                }
-            }
-        }
-    }), 200
+    return _static_json_response(_API_DOCS_BYTES, _API_DOCS_ETAG)
 
 if __name__ == '__main__':
-    # Run the Flask app
+    # Run the Flask development server (local use only)
     print("Starting Activepieces Workflow Generator API...")
     print("Web interface available at: http://localhost:5000")
+    print("For production use: gunicorn -c gunicorn.conf.py api:app")
     
     # Print pieces summary
     print(f"\n📊 Loaded {len(PIECE_INDEX)} pieces with:")
-    print(f"   - {sum(len(p.get('actions', [])) for p in PIECE_INDEX.values())} total actions")
-    print(f"   - {sum(len(p.get('triggers', [])) for p in PIECE_INDEX.values())} total triggers")
+    print(f"   - {_TOTAL_ACTIONS} total actions")
+    print(f"   - {_TOTAL_TRIGGERS} total triggers")
     
     print("\nEndpoints:")
     print("  GET  /          - Web interface")
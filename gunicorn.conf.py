@@ -0,0 +1,16 @@
+# Gunicorn configuration for production
+# Start the API with: gunicorn -c gunicorn.conf.py api:app
+
+import multiprocessing
+
+bind = "0.0.0.0:5000"
+
+# gevent workers let a single process keep many OpenAI calls in flight; the
+# worker monkey-patches socket I/O itself before loading api:app
+worker_class = "gevent"
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_connections = 1000
+
+# For gevent workers this is the worker heartbeat timeout, not a per-request
+# limit; slow OpenAI calls yield to the event loop and keep the worker alive
+timeout = 120
@@ -1,27 +1,21 @@
+import httpx
 import openai
+import orjson
 import json
 import re
 import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
 
-# Load pieces index - try multiple paths
 import os
 import sys
 
-# Try to find pieces_index.json in multiple locations
-possible_paths = [
-    "pieces_index.json",  # Current directory
-    os.path.join(os.path.dirname(__file__), "pieces_index.json"),  # Same directory as script
-    r"C:\Users\sshas\OneDrive\Desktop\Work Related\Json Generator\pieces_index.json"  # Original path
-]
-
-PIECE_INDEX = {}
-for path in possible_paths:
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            PIECE_INDEX = json.load(f)
-        break
-
-if not PIECE_INDEX:
+# Load pieces index shipped alongside this module
+PIECE_INDEX: dict
+try:
+    PIECE_INDEX = orjson.loads(Path(__file__).with_name("pieces_index.json").read_bytes())
+except FileNotFoundError:
     print("Warning: pieces_index.json not found. Using minimal set.")
     PIECE_INDEX = {
         "@activepieces/piece-gmail": {"actions": ["gmail_send_email"], "triggers": ["new_email"]},
@@ -34,19 +28,28 @@ if not PIECE_INDEX:
 api_key = os.environ.get('OPENAI_API_KEY')
 if not api_key:
     try:
-        from config import OPENAI_API_KEY
+        from config import OPENAI_API_KEY  # type: ignore[import-not-found]
         api_key = OPENAI_API_KEY
     except ImportError:
         print("Warning: No OpenAI API key found. Set OPENAI_API_KEY environment variable or create config.py")
         api_key = None
 
 if api_key:
-    client = openai.OpenAI(api_key=api_key)
+    # One pooled HTTP/2 client so concurrent requests share warm connections
+    # instead of paying a TCP+TLS handshake each. Completions are not streamed,
+    # so the read timeout covers the whole generation; max_tokens=4000 outputs
+    # can run well past a minute
+    _http_client = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=httpx.Timeout(120.0, connect=5.0)
+    )
+    client = openai.OpenAI(api_key=api_key, http_client=_http_client)
 else:
     print("Error: OpenAI API key is required to run this application")
     sys.exit(1)
 
-def build_piece_description():
+def build_piece_description() -> str:
     """Build a formatted description of all available pieces"""
     # Only include pieces that have actions or triggers
     relevant_pieces = {k: v for k, v in PIECE_INDEX.items() 
@@ -57,44 +60,51 @@ def build_piece_description():
         for piece, data in relevant_pieces.items()
     ])
 
-def suggest_pieces_for_prompt(prompt: str) -> list:
-    """Suggest relevant pieces based on keywords in the prompt"""
-    prompt_lower = prompt.lower()
-    suggestions = []
-    
-    # Keyword mappings to pieces
-    keyword_map = {
-        'email': ['@activepieces/piece-gmail', '@activepieces/piece-smtp', '@activepieces/piece-sendgrid'],
-        'spreadsheet': ['@activepieces/piece-google-sheets', '@activepieces/piece-microsoft-excel-365'],
-        'database': ['@activepieces/piece-postgres', '@activepieces/piece-mysql', '@activepieces/piece-mongodb'],
-        'slack': ['@activepieces/piece-slack'],
-        'discord': ['@activepieces/piece-discord'],
-        'ai': ['@activepieces/piece-openai', '@activepieces/piece-claude', '@activepieces/piece-google-gemini'],
-        'chatgpt': ['@activepieces/piece-openai'],
-        'schedule': ['@activepieces/piece-schedule'],
-        'webhook': ['@activepieces/piece-webhook'],
-        'api': ['@activepieces/piece-http', '@activepieces/piece-webhook'],
-        'approval': ['@activepieces/piece-approval'],
-        'sms': ['@activepieces/piece-twilio', '@activepieces/piece-messagebird'],
-        'whatsapp': ['@activepieces/piece-whatsapp'],
-        'payment': ['@activepieces/piece-stripe', '@activepieces/piece-square'],
-        'crm': ['@activepieces/piece-salesforce', '@activepieces/piece-hubspot', '@activepieces/piece-pipedrive'],
-        'calendar': ['@activepieces/piece-google-calendar', '@activepieces/piece-cal-com'],
-        'file': ['@activepieces/piece-google-drive', '@activepieces/piece-dropbox', '@activepieces/piece-amazon-s3'],
-        'pdf': ['@activepieces/piece-pdf'],
-        'image': ['@activepieces/piece-image-helper', '@activepieces/piece-image-ai']
-    }
+# Keyword mappings to pieces
+_KEYWORD_MAP: dict[str, list[str]] = {
+    'email': ['@activepieces/piece-gmail', '@activepieces/piece-smtp', '@activepieces/piece-sendgrid'],
+    'spreadsheet': ['@activepieces/piece-google-sheets', '@activepieces/piece-microsoft-excel-365'],
+    'database': ['@activepieces/piece-postgres', '@activepieces/piece-mysql', '@activepieces/piece-mongodb'],
+    'slack': ['@activepieces/piece-slack'],
+    'discord': ['@activepieces/piece-discord'],
+    'ai': ['@activepieces/piece-openai', '@activepieces/piece-claude', '@activepieces/piece-google-gemini'],
+    'chatgpt': ['@activepieces/piece-openai'],
+    'schedule': ['@activepieces/piece-schedule'],
+    'webhook': ['@activepieces/piece-webhook'],
+    'api': ['@activepieces/piece-http', '@activepieces/piece-webhook'],
+    'approval': ['@activepieces/piece-approval'],
+    'sms': ['@activepieces/piece-twilio', '@activepieces/piece-messagebird'],
+    'whatsapp': ['@activepieces/piece-whatsapp'],
+    'payment': ['@activepieces/piece-stripe', '@activepieces/piece-square'],
+    'crm': ['@activepieces/piece-salesforce', '@activepieces/piece-hubspot', '@activepieces/piece-pipedrive'],
+    'calendar': ['@activepieces/piece-google-calendar', '@activepieces/piece-cal-com'],
+    'file': ['@activepieces/piece-google-drive', '@activepieces/piece-dropbox', '@activepieces/piece-amazon-s3'],
+    'pdf': ['@activepieces/piece-pdf'],
+    'image': ['@activepieces/piece-image-helper', '@activepieces/piece-image-ai']
+}
+
+@lru_cache(maxsize=4096)
+def _suggest_pieces_for_lowered(prompt_lower: str) -> tuple[str, ...]:
+    suggestions: list[str] = []
     
-    for keyword, pieces in keyword_map.items():
+    for keyword, pieces in _KEYWORD_MAP.items():
         if keyword in prompt_lower:
             suggestions.extend(pieces)
     
     # Remove duplicates while preserving order
-    seen = set()
-    return [x for x in suggestions if not (x in seen or seen.add(x))]
+    return tuple(dict.fromkeys(suggestions))
 
-def generate_workflow(prompt: str) -> dict:
-    system_prompt = f"""
+@lru_cache(maxsize=4096)
+def suggest_pieces_for_prompt(prompt: str) -> tuple[str, ...]:
+    """Suggest relevant pieces based on keywords in the prompt"""
+    # Prompts that differ only in case share the keyword scan
+    return _suggest_pieces_for_lowered(prompt.lower())
+
+# PIECE_INDEX is fixed for the lifetime of the process, so the piece description
+# and the system prompt built from it are computed once at import time
+_PIECE_DESCRIPTION = build_piece_description()
+
+_SYSTEM_PROMPT = f"""
 You are a professional Activepieces workflow builder.
 Generate a valid Activepieces workflow JSON with this EXACT structure:
 
@@ -155,7 +165,7 @@ CRITICAL RULES:
 7. Auth in input uses: "auth": "{{{{connections['connection-name']}}}}"
 
 Available pieces and their actions/triggers:
-{build_piece_description()}
+{_PIECE_DESCRIPTION}
 
 IMPORTANT naming conventions and examples:
 - Use snake_case for all action/trigger names (e.g., send_email, new_row_added)
@@ -186,25 +196,47 @@ When user mentions:
 Return ONLY valid JSON, no markdown or comments.
 """
 
+# Identical prompts are common when workflows are regenerated, so the raw model
+# output is cached by exact prompt text. Only complete JSON objects are returned;
+# anything else raises, and lru_cache never caches exceptions, so a bad
+# completion is retried on the next call. validate_workflow() still runs on
+# every call because it mutates the parsed dict
+@lru_cache(maxsize=1024)
+def _complete_workflow(prompt: str) -> str:
     response = client.chat.completions.create(
         model="gpt-4-turbo",
         response_format={"type": "json_object"},
         messages=[
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": _SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ],
         temperature=0.1,
+        seed=0,  # Keep repeated prompts as reproducible as possible
         max_tokens=4000  # Increased for complex workflows
     )
 
-    workflow = json.loads(response.choices[0].message.content)
+    choice = response.choices[0]
+    if choice.finish_reason == "length":
+        raise ValueError("Model output was truncated before the workflow JSON was complete")
+    if choice.finish_reason != "stop":
+        raise ValueError(f"Model did not finish the workflow (finish_reason: {choice.finish_reason})")
+    
+    content = choice.message.content
+    if content is None:
+        raise ValueError("Model returned no workflow content")
+    if not isinstance(orjson.loads(content), dict):
+        raise ValueError("Workflow must be a dictionary.")
+    return content
+
+def generate_workflow(prompt: str) -> dict:
+    workflow = orjson.loads(_complete_workflow(prompt))
     return validate_workflow(workflow)
 
 def validate_workflow(workflow: dict) -> dict:
     if not isinstance(workflow, dict):
         raise ValueError("Workflow must be a dictionary.")
 
-    timestamp = str(int(time.time() * 1000))
+    timestamp = str(time.time_ns() // 1_000_000)
     workflow["created"] = workflow.get("created", timestamp)
     workflow["updated"] = workflow.get("updated", timestamp)
     workflow["description"] = workflow.get("description", "")
@@ -219,12 +251,12 @@ def validate_workflow(workflow: dict) -> dict:
     for piece in workflow["pieces"]:
         if piece not in PIECE_INDEX:
             print(f"Warning: Unknown piece {piece} - removing from list")
-            workflow["pieces"].remove(piece)
+    workflow["pieces"] = [piece for piece in workflow["pieces"] if piece in PIECE_INDEX]
 
     if not isinstance(workflow.get("template"), dict):
         workflow["template"] = {}
 
-    template = workflow["template"]
+    template: dict = workflow["template"]
     template["schemaVersion"] = "2"
     template["valid"] = True
     template["displayName"] = workflow.get("name", "Untitled Workflow")
@@ -232,10 +264,10 @@ def validate_workflow(workflow: dict) -> dict:
     if not isinstance(template.get("connectionIds"), list):
         template["connectionIds"] = []
 
-    def patch_step(step):
-        if not isinstance(step, dict):
-            return
-        
+    # Walk the trigger and its chain of nextAction steps
+    next_step: Any = template.get("trigger")
+    while isinstance(next_step, dict):
+        step: dict[str, Any] = next_step
         # Ensure proper type
         if "triggerName" in step.get("settings", {}):
             step["type"] = "PIECE_TRIGGER"
@@ -245,7 +277,7 @@ def validate_workflow(workflow: dict) -> dict:
         step.setdefault("valid", True)
         step.setdefault("displayName", step.get("name", "Unnamed Step"))
         
-        settings = step.setdefault("settings", {})
+        settings: dict = step.setdefault("settings", {})
         if "pieceName" in settings:
             settings.setdefault("pieceVersion", "~0.1.0")
             settings.setdefault("pieceType", "OFFICIAL")
@@ -259,22 +291,26 @@ def validate_workflow(workflow: dict) -> dict:
                 "continueOnFailure": {"value": False}
             }
         
-        # Recursively patch nextAction
-        if "nextAction" in step:
-            patch_step(step["nextAction"])
-
-    patch_step(template.get("trigger"))
+        next_step = step.get("nextAction")
 
     return workflow
 
+# Characters stripped from workflow names when building filenames
+_CLEAN_NAME_RE = re.compile(r'[^\w\s-]')
+_SPACE_TO_UNDERSCORE = str.maketrans(' ', '_')
+
+def workflow_filename(workflow: dict) -> str:
+    """Return the filename save_workflow() writes the workflow to"""
+    clean_name = _CLEAN_NAME_RE.sub('', workflow["name"]).strip().translate(_SPACE_TO_UNDERSCORE)
+    return f"{clean_name}.json"
+
 def save_workflow(workflow: dict) -> str:
-    clean_name = re.sub(r'[^\w\s-]', '', workflow["name"]).strip().replace(' ', '_')
-    filename = f"{clean_name}.json"
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(workflow, f, indent=2)
+    filename = workflow_filename(workflow)
+    with open(filename, "wb") as f:
+        f.write(orjson.dumps(workflow, option=orjson.OPT_INDENT_2))
     return filename
 
-def print_pieces_summary():
+def print_pieces_summary() -> None:
     """Print a summary of available pieces"""
     total_pieces = len(PIECE_INDEX)
     pieces_with_content = sum(1 for p in PIECE_INDEX.values() if p.get('actions') or p.get('triggers'))